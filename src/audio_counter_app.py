@@ -7,13 +7,15 @@ It provides a graphical interface with options to configure detection mode,
 model selection, TTS feedback, and more.
 
 The code uses PyQt5 for the GUI, sounddevice for microphone capture, and
-pyttsx3 for text-to-speech feedback. Actual audio event classification is not
-implemented and is left as a TODO for future development.
+pyttsx3 for text-to-speech feedback. Selecting the YAMNet model classifies
+events with a TFLite interpreter; the Dummy and Other models fall back to a
+placeholder amplitude threshold.
 
 To create a standalone executable on Windows you can use PyInstaller:
     pyinstaller --onefile audio_counter_app.py
 """
 
+import os
 import queue
 import random
 import sys
@@ -26,6 +28,108 @@ import pyttsx3
 import sounddevice as sd
 from PyQt5 import QtCore, QtWidgets
 
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - optional dependency
+    njit = None
+
+try:
+    from tflite_runtime.interpreter import Interpreter
+except ImportError:  # pragma: no cover - optional dependency
+    Interpreter = None
+
+# Source for the amplitude kernel. The threshold is substituted as a literal so
+# the compiler can fold it into the comparison; the kernel is regenerated
+# whenever the threshold changes. Samples are widened to int32 so that
+# abs(-32768) does not overflow, and the sum is compared against
+# ``threshold * n`` instead of dividing.
+_AMPLITUDE_KERNEL_SOURCE = """
+def mean_abs_exceeds(x):
+    n = x.shape[0]
+    s = 0
+    for i in range(n):
+        v = np.int32(x[i])
+        s += v if v >= 0 else -v
+    return s > {threshold} * n
+"""
+
+
+def _build_amplitude_kernel(threshold: int):
+    """Compile an int16 mean-abs threshold check specialized for ``threshold``.
+
+    Returns ``None`` when Numba is not installed.
+    """
+    if njit is None:
+        return None
+    namespace = {"np": np}
+    exec(_AMPLITUDE_KERNEL_SOURCE.format(threshold=int(threshold)), namespace)
+    kernel = njit(fastmath=True, nogil=True)(namespace["mean_abs_exceeds"])
+    # Compile the int16 specialization now rather than in the audio callback.
+    kernel(np.zeros(1, dtype=np.int16))
+    return kernel
+
+
+SAMPLE_RATE = 44100
+# Audio is captured as int16; dividing by this maps it to [-1, 1).
+INT16_SCALE = 32768
+# Event classes only need content below 4 kHz, so audio for the model is
+# low-pass filtered and decimated to SAMPLE_RATE / DECIMATION (8.82 kHz).
+DECIMATION = 5
+_DECIMATION_CUTOFF_HZ = 3800.0
+_DECIMATION_TAPS = 31
+
+
+def _lowpass_taps(numtaps: int, cutoff: float, fs: float) -> np.ndarray:
+    """Hamming-windowed sinc low-pass FIR, equivalent to ``scipy.signal.firwin``."""
+    n = np.arange(numtaps) - (numtaps - 1) / 2
+    taps = np.sinc(2 * cutoff / fs * n) * np.hamming(numtaps)
+    return (taps / taps.sum()).astype(np.float32)
+
+
+# YAMNet expects 16 kHz mono input and scores the AudioSet classes below.
+YAMNET_SAMPLE_RATE = 16000
+_YAMNET_CLASS_INDEX = {"Laughter": 13, "Screaming": 11}
+# Run the model at most once per YAMNet hop (0.48 s) of new audio.
+_MODEL_HOP_SECONDS = 0.48
+
+# Minimum spacing between two reported events.
+_EVENT_COOLDOWN_NS = 1_000_000_000
+# Minimum spacing between two stream status messages sent to the GUI.
+_STATUS_INTERVAL_NS = 100_000_000
+
+
+def _load_interpreter(model_path: str, num_threads: int):
+    """Create a TFLite interpreter, preferring the lightweight runtime package."""
+    if Interpreter is not None:
+        return Interpreter(model_path=model_path, num_threads=num_threads)
+    import tensorflow as tf  # pragma: no cover - heavy optional dependency
+
+    return tf.lite.Interpreter(model_path=model_path, num_threads=num_threads)
+
+
+# Spoken feedback, keyed by (language, mode).
+_PHRASES = {
+    ("en", "Laughter"): "You laughed {n} times.",
+    ("en", "Screaming"): "You screamed {n} times.",
+    ("ko", "Laughter"): "당신은 {n}번 웃었습니다.",
+    ("ko", "Screaming"): "당신은 {n}번 비명을 질렀습니다.",
+}
+
+
+def _set_thread_realtime(enabled: bool):
+    """Switch the calling thread to round-robin real-time scheduling on Linux, or back.
+
+    Silently does nothing when the platform lacks the API or the process is not
+    allowed to change its scheduling policy.
+    """
+    if not hasattr(os, "sched_setscheduler"):
+        return
+    policy, priority = (os.SCHED_RR, 20) if enabled else (os.SCHED_OTHER, 0)
+    try:
+        os.sched_setscheduler(0, policy, os.sched_param(priority))
+    except PermissionError:
+        pass
+
 
 @dataclass
 class AppConfig:
@@ -36,6 +140,13 @@ class AppConfig:
     tts_enabled: bool = True
     tts_volume: float = 1.0
     language: str = "en"
+    # Input latency passed to sounddevice: "low", "high" or seconds. Values
+    # below ~5 ms may cause input overflows on slower hosts.
+    latency: str | float = "low"
+    # TFLite model used when ``model`` is "YAMNet". Full-int8 quantized models
+    # are supported; inputs and outputs are (de)quantized automatically.
+    model_path: str = "models/yamnet.tflite"
+    model_threads: int = 6
 
 
 class AudioWorker(QtCore.QThread):
@@ -47,67 +158,331 @@ class AudioWorker(QtCore.QThread):
     def __init__(self, config: AppConfig, parent=None):
         super().__init__(parent)
         self.config = config
-        self._running = False
-        self._last_event_time = 0.0
-        self._queue = queue.Queue()
+        self._stop_evt = threading.Event()
+        # Set by the audio callback when a new model hop is buffered, and by
+        # stop() to wake the model loop.
+        self._window_ready = threading.Event()
+        self._last_event_ns = 0
+        self._last_status_ns = 0
+        self._pending_status = None  # newest status not yet sent to the GUI
+        self._rbits = random.getrandbits
+        self._count = 0
         self.stream = None
-        self.threshold = 0.1  # Placeholder threshold for detection
+        # Placeholder amplitude threshold, as a fraction of full scale
+        self.threshold = 0.1
+        # Scratch buffer for the NumPy amplitude path, sized on first use to
+        # the device's block length.
+        self._absbuf = np.empty(0, dtype=np.int32)
+        # Decimator state: reversed taps for a sliding dot product, the tail of
+        # the previous block (in int16 units), and the offset of the next
+        # sample to keep. The taps also dequantize the output to [-1, 1).
+        taps = _lowpass_taps(_DECIMATION_TAPS, _DECIMATION_CUTOFF_HZ, SAMPLE_RATE) / np.float32(INT16_SCALE)
+        self._dec_taps = taps[::-1].copy()
+        self._dec_hist = np.zeros(_DECIMATION_TAPS - 1, dtype=np.float32)
+        self._dec_phase = 0
+        # Ring buffer holding the most recent second of decimated audio.
+        self._ring = np.zeros(SAMPLE_RATE // DECIMATION, dtype=np.float32)
+        self._widx = 0
+        self._interpreter = None
+        self.model_threshold = 0.3  # Minimum mean class score for a model detection
+
+    @property
+    def threshold(self) -> float:
+        return self._threshold
+
+    @threshold.setter
+    def threshold(self, value: float):
+        # The amplitude check runs on raw int16 samples, so convert the
+        # threshold once here instead of on every callback. The specialized
+        # kernel is rebuilt when the worker next starts; until then the NumPy
+        # path is used.
+        self._threshold = value
+        self._threshold_i16 = round(value * INT16_SCALE)
+        self._amp_kernel = None
 
     def run(self):
-        self._running = True
+        self._pending_status = None
+        if self._amp_kernel is None:
+            self._amp_kernel = _build_amplitude_kernel(self._threshold_i16)
+        self._interpreter = None
+        if self.config.model == "YAMNet":
+            try:
+                self._load_model()
+            except Exception as exc:  # pragma: no cover - depends on local model
+                self.status_update.emit(f"Model unavailable, using amplitude: {exc}")
         self.status_update.emit("Listening")
         try:
-            with sd.InputStream(channels=1, callback=self.audio_callback, samplerate=44100, blocksize=1024):
-                while self._running:
-                    time.sleep(0.1)
+            # On Linux, PortAudio's callback thread is created when the stream
+            # starts and inherits this thread's scheduling policy. Only that
+            # thread needs real-time priority, so drop back once it is running.
+            _set_thread_realtime(True)
+            with sd.InputStream(
+                channels=1,
+                callback=self.audio_callback,
+                samplerate=SAMPLE_RATE,
+                blocksize=0,  # let PortAudio use the device period
+                latency=self.config.latency,
+                dtype="int16",
+            ):
+                _set_thread_realtime(False)
+                if self._interpreter is not None:
+                    self._model_loop()
+                else:
+                    self._stop_evt.wait()
         except Exception as exc:  # pragma: no cover - placeholder
             self.status_update.emit(f"Error: {exc}")
+        _set_thread_realtime(False)
+        # Cleared here rather than at the top of run() so a stop() issued
+        # before the thread got scheduled is not lost.
+        self._stop_evt.clear()
+        self._window_ready.clear()
         self.status_update.emit("Paused")
 
     def stop(self):
-        self._running = False
+        self._stop_evt.set()
+        self._window_ready.set()
+
+    @property
+    def count(self) -> int:
+        """Total number of events detected by this worker.
+
+        Only the worker increments this and it is never reset, so readers on
+        other threads see a monotonically increasing value. Callers keep their
+        own baseline to count from a given point.
+        """
+        return self._count
 
     def audio_callback(self, indata, frames, time_info, status):
-        if not self._running:
+        if self._stop_evt.is_set():
             return
         if status:
-            self.status_update.emit(str(status))
-        if self.detect_event(indata[:, 0]):
+            self._report_status(str(status))
+        elif self._pending_status is not None:
+            self._report_status()
+        # With a single channel the (frames, 1) buffer flattens to a
+        # contiguous 1-D view without copying.
+        if self.detect_event(indata.reshape(-1)):
+            self._report_event()
+
+    def _report_event(self):
+        self._count += 1
+        # The GUI polls ``count`` for display; the signal is only needed
+        # to trigger spoken feedback.
+        if self.config.tts_enabled:
             self.event_detected.emit()
 
+    def _report_status(self, text: str | None = None):
+        """Forward stream status to the GUI at most once per status interval.
+
+        A status arriving within the interval is held, and the newest held one
+        is sent by the first callback after the interval has passed.
+        """
+        if text is not None:
+            self._pending_status = text
+        now = time.monotonic_ns()
+        if now - self._last_status_ns > _STATUS_INTERVAL_NS:
+            self.status_update.emit(self._pending_status)
+            self._pending_status = None
+            self._last_status_ns = now
+
+    def _decimate(self, x: np.ndarray) -> np.ndarray:
+        """Low-pass filter and downsample a block, carrying state across calls.
+
+        Only the retained output samples are computed, so the filter costs
+        ``1 / DECIMATION`` of a full-rate convolution.
+        """
+        buf = np.concatenate((self._dec_hist, x))
+        windows = np.lib.stride_tricks.sliding_window_view(buf, _DECIMATION_TAPS)
+        out = windows[self._dec_phase :: DECIMATION] @ self._dec_taps
+        self._dec_hist = buf[-(_DECIMATION_TAPS - 1) :]
+        self._dec_phase = (self._dec_phase - x.shape[0]) % DECIMATION
+        return out
+
+    def _write_ring(self, x: np.ndarray):
+        """Copy a block into the ring buffer, wrapping at the end."""
+        ring = self._ring
+        size = ring.shape[0]
+        n = x.shape[0]
+        if n >= size:
+            np.copyto(ring, x[-size:])
+            self._widx = 0
+            return
+        end = self._widx + n
+        if end <= size:
+            np.copyto(ring[self._widx : end], x)
+        else:
+            split = size - self._widx
+            np.copyto(ring[self._widx :], x[:split])
+            np.copyto(ring[: end - size], x[split:])
+        self._widx = end % size
+
+    def _latest_window(self, samples: int) -> np.ndarray:
+        """Return the newest ``samples`` from the ring in chronological order.
+
+        This is a view unless the window straddles the end of the buffer, in
+        which case the two halves are joined into a new array.
+        """
+        end = self._widx
+        start = end - samples
+        if start >= 0:
+            return self._ring[start:end]
+        if end == 0:
+            return self._ring[start:]
+        return np.concatenate((self._ring[start:], self._ring[:end]))
+
+    def _load_model(self):
+        """Load the TFLite model and precompute its input resampling grid."""
+        interpreter = _load_interpreter(self.config.model_path, self.config.model_threads)
+        interpreter.allocate_tensors()
+        self._model_in = interpreter.get_input_details()[0]
+        self._model_out = interpreter.get_output_details()[0]
+        n_in = int(self._model_in["shape"][-1])
+        rate = SAMPLE_RATE / DECIMATION
+        n_hist = int(np.ceil(n_in * rate / YAMNET_SAMPLE_RATE))
+        # The model loop reads the window while the callback keeps writing, so
+        # leave at least one window of headroom before it is overwritten.
+        if 2 * n_hist > self._ring.shape[0]:
+            self._ring = np.zeros(2 * n_hist, dtype=np.float32)
+        self._reset_model_buffers()
+        # Length of the decimated window fed to the model and the positions at
+        # which it is resampled to the model's 16 kHz input.
+        self._model_window = n_hist
+        self._model_xp = np.arange(n_hist)
+        self._model_grid = np.linspace(0, n_hist - 1, n_in)
+        self._model_hop = int(_MODEL_HOP_SECONDS * rate)
+        self._model_pending = 0
+        self._interpreter = interpreter
+
+    def _reset_model_buffers(self):
+        """Drop audio buffered by a previous session."""
+        self._ring.fill(0)
+        self._widx = 0
+        self._dec_hist = np.zeros(_DECIMATION_TAPS - 1, dtype=np.float32)
+        self._dec_phase = 0
+
+    def _feed_model(self, data: np.ndarray):
+        """Buffer a raw block for the model, waking the worker after each hop.
+
+        Runs in the audio callback: the block is decimated and dequantized into
+        the ring buffer, and inference itself is left to ``_model_loop``.
+        """
+        sig = self._decimate(data)
+        self._write_ring(sig)
+        self._model_pending += sig.shape[0]
+        if self._model_pending >= self._model_hop:
+            self._model_pending = 0
+            self._window_ready.set()
+
+    def _model_loop(self):
+        """Run the model on the worker thread each time a hop is buffered."""
+        while True:
+            self._window_ready.wait()
+            self._window_ready.clear()
+            if self._stop_evt.is_set():
+                return
+            if self._classify() and self._cooldown_elapsed():
+                self._report_event()
+
+    def _classify(self) -> bool:
+        """Run the model on the latest window and report whether the mode's class fired."""
+        window = self._latest_window(self._model_window)
+        waveform = np.interp(self._model_grid, self._model_xp, window).astype(np.float32)
+        scale, zero_point = self._model_in["quantization"]
+        if scale:
+            # The FIR can overshoot full scale on loud input; clip so values
+            # saturate instead of wrapping around when cast.
+            info = np.iinfo(self._model_in["dtype"])
+            waveform = np.round(waveform / scale + zero_point)
+            waveform = np.clip(waveform, info.min, info.max).astype(self._model_in["dtype"])
+        self._interpreter.set_tensor(self._model_in["index"], waveform.reshape(self._model_in["shape"]))
+        self._interpreter.invoke()
+        scores = self._interpreter.get_tensor(self._model_out["index"])
+        scale, zero_point = self._model_out["quantization"]
+        if scale:
+            scores = (scores.astype(np.float32) - zero_point) * scale
+        class_scores = scores.reshape(-1, scores.shape[-1]).mean(axis=0)
+        return class_scores[_YAMNET_CLASS_INDEX[self.config.mode]] > self.model_threshold
+
     def detect_event(self, data: np.ndarray) -> bool:
-        """Placeholder detection logic.
+        """Detect an event in a block of raw int16 audio.
 
-        This should be replaced with proper audio classification using the
-        selected model.
+        When the YAMNet model is loaded the block is only buffered for the
+        worker thread, which reports model detections itself, and this returns
+        False. Otherwise a placeholder amplitude threshold is applied.
         """
-        # TODO: Load and use the selected audio model for classification
-        amplitude = np.abs(data).mean()
-        now = time.time()
-        if amplitude > self.threshold and now - self._last_event_time > 1:
-            self._last_event_time = now
+        assert data.flags["C_CONTIGUOUS"], "detection expects a contiguous block"
+        if self._interpreter is not None:
+            self._feed_model(data)
+            return False
+        kernel = self._amp_kernel
+        if kernel is not None:
+            detected = kernel(data)
+        else:
+            detected = self._exceeds_threshold(data)
+        # Only read the clock once something was detected; quiet blocks are
+        # the common case.
+        if detected and self._cooldown_elapsed():
             return True
-        # Simulate occasional detection so the UI can be tested
-        if random.random() < 0.001:
-            self._last_event_time = now
+        # Simulate occasional detection (1 in 1024 blocks) so the UI can be tested
+        if self._rbits(10) == 0:
+            self._last_event_ns = time.monotonic_ns()
             return True
         return False
 
+    def _cooldown_elapsed(self) -> bool:
+        """Start a new cooldown and return True if the previous one has expired."""
+        now = time.monotonic_ns()
+        if now - self._last_event_ns > _EVENT_COOLDOWN_NS:
+            self._last_event_ns = now
+            return True
+        return False
+
+    def _exceeds_threshold(self, data: np.ndarray) -> bool:
+        """NumPy amplitude check, used when no compiled kernel is available."""
+        n = data.shape[0]
+        if n > self._absbuf.shape[0]:
+            self._absbuf = np.empty(n, dtype=np.int32)
+        # Only ever grown, so shorter blocks reuse a prefix without reallocating.
+        absbuf = self._absbuf[:n]
+        # Compute in int32 so abs(-32768) does not wrap around.
+        np.abs(data, out=absbuf, dtype=np.int32)
+        return absbuf.sum(dtype=np.int64) > self._threshold_i16 * data.shape[0]
+
 
 class MainWindow(QtWidgets.QMainWindow):
     """Main application window."""
 
+    # Emitted from the TTS thread; queued to the GUI thread for display.
+    tts_error = QtCore.pyqtSignal(str)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Audio Event Counter")
         self.config = AppConfig()
         self.counter = 0
-        self.tts_engine = pyttsx3.init()
-        self.tts_engine.setProperty("volume", self.config.tts_volume)
+        self._count_base = 0  # worker count at the last reset
+        self._update_phrase_template()
+        # Created on first use by the TTS thread; loading the speech driver is
+        # slow and unnecessary when feedback is never spoken. Only the TTS
+        # thread touches the engine, including applying volume changes.
+        self.tts_engine = None
+        self._applied_volume = None
+        # A single thread owns the (non thread-safe) engine and speaks queued
+        # phrases in order. The queue is bounded so detection bursts are dropped
+        # instead of piling up.
+        self._tts_q = queue.Queue(maxsize=4)
+        self._tts_thread = threading.Thread(target=self._tts_loop, daemon=True)
+        self.tts_error.connect(self.on_status_update)
+        self._tts_thread.start()
         self._build_ui()
         self.audio_worker = AudioWorker(self.config)
         self.audio_worker.event_detected.connect(self.on_event_detected)
         self.audio_worker.status_update.connect(self.on_status_update)
+        # Refresh the counter from the worker at a fixed rate so bursts of
+        # detections do not translate into a repaint per event.
+        self._count_timer = QtCore.QTimer(self)
+        self._count_timer.timeout.connect(self.poll_count)
+        self._count_timer.start(100)
 
     # ------------------------------------------------------------------
     # UI setup
@@ -152,7 +527,7 @@ class MainWindow(QtWidgets.QMainWindow):
         mode_layout.addWidget(self.mode_combo)
         layout.addLayout(mode_layout)
 
-        # Model selection (placeholder)
+        # Model selection ("Other" uses the amplitude placeholder)
         model_layout = QtWidgets.QHBoxLayout()
         model_layout.addWidget(QtWidgets.QLabel("Model:"))
         self.model_combo = QtWidgets.QComboBox()
@@ -192,8 +567,10 @@ class MainWindow(QtWidgets.QMainWindow):
     def start_detection(self):
         if self.audio_worker.isRunning():
             return
-        self.counter = 0
-        self.update_counter_label()
+        self._reset_counter()
+        # Normal priority: the worker compiles the kernel and runs model
+        # inference, and a QThread priority would not reach PortAudio's
+        # callback thread anyway.
         self.audio_worker.start()
 
     def pause_detection(self):
@@ -202,34 +579,40 @@ class MainWindow(QtWidgets.QMainWindow):
             self.audio_worker.wait()
 
     def reset_count(self):
-        self.counter = 0
-        self.update_counter_label()
+        self._reset_counter()
 
     def change_mode(self, text: str):
         self.config.mode = text
-        self.counter = 0
-        self.update_counter_label()
+        self._update_phrase_template()
+        self._reset_counter()
 
     def change_model(self, text: str):
+        # The worker loads the model in run(), so this applies on the next Start.
         self.config.model = text
-        # TODO: Load selected model and apply in detection
 
     def toggle_tts(self, state: int):
         self.config.tts_enabled = state == QtCore.Qt.Checked
 
     def change_volume(self, value: int):
+        # Applied by the TTS thread before the next phrase, so a slider drag
+        # costs at most one engine call.
         self.config.tts_volume = value / 100.0
-        self.tts_engine.setProperty("volume", self.config.tts_volume)
 
     def change_language(self, text: str):
         self.config.language = "en" if text == "English" else "ko"
+        self._update_phrase_template()
 
     def on_event_detected(self):
-        self.counter += 1
-        self.update_counter_label()
+        self.poll_count()
         if self.config.tts_enabled:
             self.speak_count()
 
+    def poll_count(self):
+        count = self.audio_worker.count - self._count_base
+        if count != self.counter:
+            self.counter = count
+            self.update_counter_label()
+
     def on_status_update(self, text: str):
         self.status_label.setText(f"Status: {text}")
 
@@ -239,18 +622,43 @@ class MainWindow(QtWidgets.QMainWindow):
     def _counter_text(self) -> str:
         return f"{self.config.mode} count: {self.counter}"
 
+    def _reset_counter(self):
+        self._count_base = self.audio_worker.count
+        self.counter = 0
+        self.update_counter_label()
+
     def update_counter_label(self):
         self.counter_label.setText(self._counter_text())
 
+    def _update_phrase_template(self):
+        self._phrase_template = _PHRASES[(self.config.language, self.config.mode)]
+
     def speak_count(self):
-        phrases = {
-            "en": {"Laughter": "You laughed {n} times.", "Screaming": "You screamed {n} times."},
-            "ko": {"Laughter": "당신은 {n}번 웃었습니다.", "Screaming": "당신은 {n}번 비명을 질렀습니다."},
-        }
-        phrase = phrases[self.config.language][self.config.mode].format(n=self.counter)
-        threading.Thread(target=self._speak, args=(phrase,), daemon=True).start()
+        try:
+            self._tts_q.put_nowait(self._phrase_template.format(n=self.counter))
+        except queue.Full:
+            pass
+
+    def _tts_loop(self):  # pragma: no cover - GUI / TTS
+        while True:
+            text = self._tts_q.get()
+            # Keep the only TTS thread alive if the engine fails; otherwise the
+            # queue fills and every later phrase is silently dropped.
+            try:
+                self._speak(text)
+            except Exception as exc:
+                self.tts_error.emit(f"TTS error: {exc}")
+
+    def _ensure_tts(self):
+        if self.tts_engine is None:
+            self.tts_engine = pyttsx3.init()
 
     def _speak(self, text: str):  # pragma: no cover - GUI / TTS
+        self._ensure_tts()
+        volume = self.config.tts_volume
+        if volume != self._applied_volume:
+            self.tts_engine.setProperty("volume", volume)
+            self._applied_volume = volume
         self.tts_engine.say(text)
         self.tts_engine.runAndWait()
 